@@ -1,8 +1,23 @@
 import streamlit as st
-import pandas as pd
-import requests
-import json
-from io import StringIO
+import orjson
+import hashlib
+import re
+import ssl
+import logging
+from collections import defaultdict
+from typing import TYPE_CHECKING, Optional
+
+# pandas, pyarrow and httpx are imported inside the functions that need them: they are slow to import and
+# a rerun with nothing pasted and no button clicked never touches them, which keeps cold starts fast
+if TYPE_CHECKING:
+    import pyarrow as pa
+
+# Module logger at INFO with its own handler (the root logger only emits WARNING and above); guarded because
+# Streamlit re-executes this module on every rerun
+logger = logging.getLogger(__name__)
+if not logger.handlers:
+    logger.setLevel(logging.INFO)
+    logger.addHandler(logging.StreamHandler())
 
 # Set up the title and description
 st.title("Query Generation Tool")
@@ -22,8 +37,8 @@ target_system = st.sidebar.selectbox(
 
 # Select Type of Validation
 st.sidebar.header("Select Type of Validation")
-validation_type = st.sidebar.selectbox(
-    "Select Validation Type", ["--Select--", "Select", "Update", "Check for Duplicate", "Null Values", "Aggregate Function", "Record count", "Compare source and target records"]
+validation_types = st.sidebar.multiselect(
+    "Select Validation Types", ["Select", "Update", "Check for Duplicate", "Null Values", "Aggregate Function", "Record count", "Compare source and target records"]
 )
 
 # Adjust Temperature with tooltip
@@ -40,14 +55,72 @@ top_p = st.sidebar.slider(
     help="Controls the diversity of the output by focusing on the most probable words.\nHow it works:\nLower Top P (closer to 0): The model will only consider the most probable words, leading to less diverse and more predictable output.\nHigher Top P (closer to 1): The model will consider a wider range of words, leading to more diverse and potentially more creative output, but potentially less coherent."
 )
 
+# Function to make pasted header names unique the way pandas does: blank headers become "Unnamed: N" and
+# repeats get ".1", ".2", ... suffixes
+def _unique_column_names(names):
+    seen = set()
+    unique = []
+    for index, name in enumerate(names):
+        name = name if name.strip() else f"Unnamed: {index}"
+        candidate, count = name, 0
+        while candidate in seen:
+            count += 1
+            candidate = f"{name}.{count}"
+        seen.add(candidate)
+        unique.append(candidate)
+    return unique
+
+# Function to parse tab-separated table data pasted from Excel, cached per unique paste so reruns skip the parse.
+# Uses pyarrow's multithreaded C++ CSV reader rather than pandas' tokenizer and returns the Arrow table itself, which
+# st.dataframe displays directly. Raises ValueError for unparseable pastes.
+@st.cache_data(max_entries=8, show_spinner=False)
+def _parse_tsv(text: str) -> "pa.Table":
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.csv
+
+    try:
+        table = pa.csv.read_csv(pa.BufferReader(text.encode()), parse_options=pa.csv.ParseOptions(delimiter="\t"))
+    except pa.ArrowInvalid:
+        # pyarrow rejects ragged rows; pandas pads short rows with nulls, as the app always has
+        from io import StringIO
+
+        df = pd.read_csv(StringIO(text), sep="\t", dtype_backend="pyarrow")
+        if not isinstance(df.index, pd.RangeIndex):
+            # Rows with more fields than the header turn the leading fields into the index; keep them as columns
+            df.index.names = [name or "" for name in df.index.names]
+            df = df.reset_index(allow_duplicates=True)
+            df.columns = _unique_column_names([str(column) for column in df.columns])
+        return pa.Table.from_pandas(df, preserve_index=False)
+    return table.rename_columns(_unique_column_names(table.column_names))
+
 # Function to display condition dropdown and textbox
 def condition_input(section_name):
     st.header(f"{section_name} Table Details")
     table_input = st.text_area(f"Paste {section_name} Table Data Here (from Excel)", height=200)
     if table_input:
-        table = pd.read_csv(StringIO(table_input), sep="\t")
-        st.write(f"{section_name} Table:")
-        st.dataframe(table)
+        import pandas as pd
+
+        # Only parse when the paste changes; unchanged reruns reuse the stored Arrow table and the pandas frame
+        # derived from it (Arrow-backed via pd.ArrowDtype, so no copy). st.dataframe is still called every run
+        # (Streamlit drops elements a rerun doesn't emit), but handing it the Arrow table skips its per-run
+        # pandas -> Arrow conversion.
+        input_hash = hashlib.blake2b(table_input.encode(), digest_size=8).hexdigest()
+        if st.session_state.get(f"{section_name}_last_hash") != input_hash:
+            try:
+                parsed = _parse_tsv(table_input)
+                st.session_state[f"{section_name}_arrow"] = parsed
+                st.session_state[f"{section_name}_table"] = parsed.to_pandas(types_mapper=pd.ArrowDtype)
+                st.session_state[f"{section_name}_last_hash"] = input_hash
+            except ValueError as e:
+                st.session_state.pop(f"{section_name}_last_hash", None)
+                st.error(f"Could not parse the pasted {section_name} table: {e}")
+        if st.session_state.get(f"{section_name}_last_hash") == input_hash:
+            table = st.session_state[f"{section_name}_table"]
+            st.write(f"{section_name} Table:")
+            st.dataframe(st.session_state[f"{section_name}_arrow"])
+        else:
+            table = None
     else:
         table = None
 
@@ -69,115 +142,373 @@ if target_table is None:
 st.header("Enter Your Google Gemini API Key")
 api_key = st.text_input("Your Google Gemini API Key", type="password")
 
+# TLS context built once (CA bundle loading is the slow part), trusting certifi's bundle like httpx's default
+@st.cache_resource
+def _ssl_ctx():
+    import certifi
+
+    return ssl.create_default_context(cafile=certifi.where())
+
+# Shared HTTP client: cache_resource keeps it alive across reruns, so Gemini calls reuse one pooled
+# HTTP/2 connection instead of paying a TCP + TLS handshake per request
+@st.cache_resource
+def _client():
+    import httpx
+
+    return httpx.Client(http2=True, verify=_ssl_ctx(), timeout=60.0, limits=httpx.Limits(max_keepalive_connections=4))
+
 # Function to verify the API key (dummy function, as the Google Gemini API doesn't provide a direct way to verify API keys)
 def verify_api_key(api_key):
+    import httpx
+
     try:
-        response = requests.post(
-            f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent?key={api_key}",
-            headers={"Content-Type": "application/json"},
-            json={"contents":[{"parts":[{"text":"Say hello"}]}]}
+        response = _client().post(
+            "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent",
+            headers={"Content-Type": "application/json", "x-goog-api-key": api_key},
+            content=orjson.dumps({"contents":[{"parts":[{"text":"Say hello"}]}]})
         )
         return response.status_code == 200
-    except requests.RequestException as e:
+    except httpx.HTTPError as e:
         return False
 
-# Verify API key button
+# Verify API key button (a key that already passed is remembered, so repeated clicks don't re-verify)
 if st.button("Verify API Key"):
-    if verify_api_key(api_key):
+    if api_key and (st.session_state.get("verified_key") == api_key or verify_api_key(api_key)):
+        st.session_state["verified_key"] = api_key
         st.success("API key is valid.")
     else:
         st.error("API key is invalid. Please check and try again.")
 
-# Function to generate the query using Google Gemini API
-def generate_query(api_key, source_system, target_system, validation_type, source_table, target_table, source_condition, source_column, source_logic, target_condition, target_column, target_logic, temperature, top_p):
-    prompt = f"""
-    You are a database expert. Generate a database query according to selected Source System and target system technology and based on following details and :
-
-    Source System: {source_system if source_system is not None else "Not provided"}
-    Target System: {target_system}
-    Validation Type: {validation_type}
-    Source Table: {source_table if source_table is not None else "Not provided"}
-    Target Table: {target_table}
-    Source Condition: {source_condition if source_condition is not None else "Not provided"}
-    Source Column: {source_column if source_column is not None else "Not provided"}
-    Source Logic: {source_logic if source_logic is not None else "Not provided"}
-    Target Condition: {target_condition if target_condition is not None else "Not provided"}
-    Target Column: {target_column if target_column is not None else "Not provided"}
-    Target Logic: {target_logic if target_logic is not None else "Not provided"}
-
-    Generate an appropriate query:
-    """
-    try:
-        response = requests.post(
-            f"https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:generateContent?key={api_key}",
-            headers={"Content-Type": "application/json"},
-            json={
-                "contents": [
-                    {
-                        "role": "user",
-                        "parts": [{"text": prompt}]
+# Function to stream text fragments from Google Gemini API as they arrive (the key goes in a header, not the URL,
+# so it never shows up in error messages)
+def stream_gemini(api_key, prompt, temperature, top_p):
+    with _client().stream(
+        "POST",
+        "https://generativelanguage.googleapis.com/v1beta/models/gemini-1.5-flash-latest:streamGenerateContent?alt=sse",
+        headers={"Content-Type": "application/json", "x-goog-api-key": api_key},
+        content=orjson.dumps({
+            "contents": [
+                {
+                    "role": "user",
+                    "parts": [{"text": prompt}]
+                }
+            ],
+            "generationConfig": {
+                "temperature": temperature,
+                "topP": top_p,
+                "responseMimeType": "application/json",
+                "responseSchema": {
+                    "type": "ARRAY",
+                    "items": {
+                        "type": "OBJECT",
+                        "properties": {
+                            "validation": {"type": "STRING"},
+                            "sql": {"type": "STRING"},
+                            "explanation": {"type": "STRING"},
+                            "note": {"type": "STRING"}
+                        },
+                        "required": ["validation", "sql"]
                     }
-                ],
-                "generationConfig": {
-                    "temperature": temperature,
-                    "topP": top_p
-                },
-                "safetySettings": [
-                    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-                    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_LOW_AND_ABOVE"},
-                    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
-                    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_ONLY_HIGH"}
-                ]
-            }
-        )
+                }
+            },
+            "safetySettings": [
+                {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+                {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_LOW_AND_ABOVE"},
+                {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_MEDIUM_AND_ABOVE"},
+                {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_ONLY_HIGH"}
+            ]
+        })
+    ) as response:
         response.raise_for_status()
 
         # Check response content type
-        content_type = response.headers.get('Content-Type')
-        if 'application/json' not in content_type:
+        content_type = response.headers.get('Content-Type', '')
+        if 'text/event-stream' not in content_type:
             raise ValueError(f"Unexpected content type: {content_type}")
 
-        return response.json()
-    except requests.exceptions.RequestException as e:
+        # Each server-sent event carries a partial response; yield its text as soon as it arrives
+        for line in response.iter_lines():
+            if not line.startswith('data:'):
+                continue
+            chunk = orjson.loads(line[len('data:'):])
+            yield chunk.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', '')
+
+# Raised by _call_gemini when a near-match redirect finds no cached response to reuse
+class _CacheMiss(Exception):
+    pass
+
+# Cached Gemini call: only prompt_key, key_hash, temperature and top_p are hashed (underscored arguments are ignored
+# by st.cache_data), so equivalent prompts reuse the earlier response instead of paying for a new generation.
+# key_hash ties entries to the API key that produced them, so another (possibly invalid) key never gets a cache hit
+# and still goes to the API. Failed calls raise and are therefore never cached.
+# With _redirected=True (prompt_key borrowed from a near-match) the body only runs on a cache miss, and then raises
+# _CacheMiss rather than generating, so this prompt's response is never stored under the other prompt's key.
+# Empty output (e.g. a safety block) and JSON that doesn't parse (e.g. a stream cut off at the token limit) raise
+# too, so they are not replayed from the cache.
+@st.cache_data(show_spinner=False, ttl=3600)
+def _call_gemini(prompt_key, _prompt, _api_key, key_hash, temperature, top_p, _redirected=False):
+    if _redirected:
+        raise _CacheMiss(prompt_key)
+    content = st.write_stream(stream_gemini(_api_key, _prompt, temperature, top_p))
+    if not content or not content.strip():
+        raise ValueError("Gemini returned no text (the response may have been blocked).")
+    orjson.loads(_unfence(content))
+    return content
+
+# Function to normalize dropdown choices so whitespace and case differences map to the same cache key
+def _normalize(value):
+    return _collapse(value).lower()
+
+# Function to normalize free text (logic, column names) for the cache key: whitespace only, since case can be
+# significant there (string literals, quoted identifiers)
+def _collapse(value):
+    return " ".join(str(value).split()) if value is not None else ""
+
+# Function to fingerprint a pasted table by its columns (in sorted order), dtypes and cell values
+def _table_fingerprint(table):
+    if table is None:
+        return "none"
+    import pandas as pd
+
+    table = table[sorted(table.columns, key=str)]
+    digest = hashlib.sha1(pd.util.hash_pandas_object(table, index=False).values.tobytes())
+    digest.update(str(table.dtypes.tolist()).encode())
+    return digest.hexdigest()
+
+# Function to build the exact cache key and the text used for near-match lookups: a prefix of the dropdown
+# choices and the condition, column and logic text (matched exactly), and a suffix describing the table columns
+def _prompt_key(source_system, target_system, validation_types, source_table, target_table, source_condition, source_column, source_logic, target_condition, target_column, target_logic):
+    choices = [_normalize(value) for value in (source_system, target_system, ", ".join(sorted(validation_types)))]
+    fields = [_collapse(value) for value in (source_condition, source_column, source_logic, target_condition, target_column, target_logic)]
+    prefix = " | ".join(choices + fields)
+    suffix = " | ".join(", ".join(sorted(_collapse(column) for column in table.columns)) if table is not None else "" for table in (source_table, target_table))
+    prompt_key = hashlib.sha1("|".join([prefix, suffix, _table_fingerprint(source_table), _table_fingerprint(target_table)]).encode()).hexdigest()
+    return prompt_key, prefix, suffix
+
+# Load the sentence embedding model used for near-match cache lookups (optional; exact-key caching works without it).
+# A failed load (package missing, model download offline, torch error) returns None, which cache_resource keeps,
+# so the load is not retried on every click.
+@st.cache_resource(show_spinner=False)
+def _embedder():
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    try:
+        return SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
+    except Exception as e:
+        logger.warning("Near-match cache disabled, embedding model failed to load: %s", e)
+        return None
+
+SEMANTIC_CACHE_THRESHOLD = 0.92
+SEMANTIC_CACHE_SIZE = 64
+
+# Function to find an earlier prompt key with the same prefix and a close enough suffix to reuse its cached response.
+# The prefix holds the dropdown choices, the condition/column/logic text, and the API key hash, temperature and top_p
+# the response was cached under, so it is compared exactly: an embedding would score swapped source and target
+# systems, a different validation set, or logic differing only in a literal ('Active' vs 'ACTIVE', 5 vs 50) as
+# near-identical. Only the table column description in the suffix is embedded.
+# Returns the key to use and the (prefix, suffix embedding) to remember prompt_key by if it ends up being generated
+# (None when there is nothing to remember).
+def _semantic_lookup(prompt_key, prefix, suffix):
+    entries = st.session_state.setdefault("semantic_cache", [])
+    if any(cached_prefix == prefix and cached_key == prompt_key for cached_prefix, _, cached_key in entries):
+        return prompt_key, None
+
+    model = _embedder()
+    if model is None:
+        return prompt_key, None
+
+    try:
+        embedding = model.encode(suffix, normalize_embeddings=True)
+    except Exception as e:
+        logger.warning("Near-match cache lookup skipped: %s", e)
+        return prompt_key, None
+    best_key, best_score = prompt_key, SEMANTIC_CACHE_THRESHOLD
+    for cached_prefix, cached_embedding, cached_key in entries:
+        if cached_prefix != prefix:
+            continue
+        score = float(embedding @ cached_embedding)
+        if score > best_score:
+            best_key, best_score = cached_key, score
+    return best_key, (prefix, embedding)
+
+# Function to remember a successfully generated prompt key for later near-match lookups
+def _semantic_remember(prompt_key, entry):
+    if entry is None:
+        return
+    entries = st.session_state.setdefault("semantic_cache", [])
+    entries.append((*entry, prompt_key))
+    del entries[:-SEMANTIC_CACHE_SIZE]
+
+# Function to drop near-match entries pointing at a prompt key whose response is no longer cached
+def _semantic_forget(prompt_key):
+    entries = st.session_state.setdefault("semantic_cache", [])
+    entries[:] = [entry for entry in entries if entry[-1] != prompt_key]
+
+# Function to summarize a pasted table as columns, dtypes, a few sample rows and the row count
+def _schema_digest(df):
+    return {"columns": list(df.columns), "dtypes": df.dtypes.astype(str).tolist(), "sample": df.head(3).to_dict(orient="records"), "nrows": len(df)}
+
+# Prompt template, built once at import; generate_query fills it with str.format_map
+_PROMPT_TMPL = """
+    You are a database expert. Generate one database query for each of the selected Validation Types according to selected Source System and target system technology and based on following details and :
+
+    Source System: {source_system}
+    Target System: {target_system}
+    Validation Types: {validation_types}
+    Source Table: {source_table}
+    Target Table: {target_table}
+    Source Condition: {source_condition}
+    Source Column: {source_column}
+    Source Logic: {source_logic}
+    Target Condition: {target_condition}
+    Target Column: {target_column}
+    Target Logic: {target_logic}
+
+    Return a JSON array with one element per validation type: [{{"validation":"...","sql":"...","explanation":"...","note":"..."}}]
+    """
+
+# Function to generate one query per validation type in a single Google Gemini API request,
+# streaming the JSON text into the page and returning it in full
+def generate_query(api_key, source_system, target_system, validation_types, source_table, target_table, source_condition, source_column, source_logic, target_condition, target_column, target_logic, temperature, top_p):
+    import httpx
+
+    # Fields left as None are omitted so the template falls back to "Not provided" for them.
+    # Tables are sent as a schema digest instead of every pasted row; query generation only needs their shape.
+    fields = {
+        "source_system": source_system,
+        "target_system": target_system,
+        "validation_types": ", ".join(validation_types),
+        "source_table": orjson.dumps(_schema_digest(source_table), default=str).decode() if source_table is not None else None,
+        "target_table": orjson.dumps(_schema_digest(target_table), default=str).decode() if target_table is not None else None,
+        "source_condition": source_condition,
+        "source_column": source_column,
+        "source_logic": source_logic,
+        "target_condition": target_condition,
+        "target_column": target_column,
+        "target_logic": target_logic,
+    }
+    prompt = _PROMPT_TMPL.format_map(defaultdict(lambda: "Not provided", {name: value for name, value in fields.items() if value is not None}))
+    key_hash = hashlib.sha256(api_key.encode()).hexdigest()
+    prompt_key, prefix, suffix = _prompt_key(source_system, target_system, validation_types, source_table, target_table, source_condition, source_column, source_logic, target_condition, target_column, target_logic)
+    match_key, semantic_entry = _semantic_lookup(prompt_key, (prefix, key_hash, temperature, top_p), suffix)
+    try:
+        if match_key != prompt_key:
+            try:
+                return _call_gemini(match_key, prompt, api_key, key_hash, temperature, top_p, _redirected=True)
+            except _CacheMiss:
+                # The near-match's response has expired or was cleared; generate under this prompt's own key
+                _semantic_forget(match_key)
+        content = _call_gemini(prompt_key, prompt, api_key, key_hash, temperature, top_p)
+        _semantic_remember(prompt_key, semantic_entry)
+        return content
+    except httpx.HTTPStatusError as e:
+        # The generation request itself doubles as the API key check
+        if e.response.status_code in (400, 401, 403):
+            st.session_state.pop("verified_key", None)
+            st.error(f"API key is invalid. Please check and try again. (HTTP {e.response.status_code})")
+        else:
+            st.error(f"API request failed: {e}")
+    except httpx.HTTPError as e:
         st.error(f"API request failed: {e}")
-        return {"error": str(e)}
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         st.error(f"Error parsing JSON response: {e}")
-        return {"error": str(e)}
     except Exception as e:
         st.error(f"Unexpected error: {e}")
-        return {"error": str(e)}
+    return ''
+
+# Markdown code fence (```sql ... ```) the model sometimes wraps around the JSON or around individual SQL values.
+# Anchored at both ends with a greedy body, so a fenced sql value inside fenced JSON doesn't end the match early.
+_FENCE_RE = re.compile(r"\A```[\w-]*\s*(?P<body>.*)```\s*\Z", re.DOTALL)
+
+# Function to strip a markdown code fence wrapping the whole text in a single regex pass
+def _unfence(text):
+    text = text.strip()
+    match = _FENCE_RE.match(text)
+    return (match['body'] if match else text).strip()
+
+# Function to turn a JSON field into display text; the schema asks for strings, but don't crash if one isn't
+def _field_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, list):
+        return "\n".join(_field_text(item) for item in value).strip()
+    return str(value).strip()
+
+# Function to parse the JSON response into SQL query, explanation, and notes keyed by validation type
+def parse_response(content, validation_types):
+    try:
+        results = orjson.loads(_unfence(content)) if content else []
+    except orjson.JSONDecodeError as e:
+        st.error(f"Error parsing JSON response: {e}")
+        results = []
+    if isinstance(results, dict):
+        results = [results]
+    results = [result for result in results if isinstance(result, dict)] if isinstance(results, list) else []
 
-# Function to parse the response and extract SQL query, explanation, and notes
-def parse_response(response):
-    content = response.get('candidates', [{}])[0].get('content', {}).get('parts', [{}])[0].get('text', '')
-    sql_query = content.split('```sql')[1].split('```')[0].strip() if '```sql' in content else 'No SQL query generated.'
-    explanation = content.split('**Explanation:**')[1].split('**Note:**')[0].strip() if '**Explanation:**' in content else ''
-    note = content.split('**Note:**')[1].strip() if '**Note:**' in content else ''
-    return sql_query, explanation, note
+    # Match results to the selected types by name first
+    by_validation = {}
+    for result in results:
+        by_validation.setdefault(_normalize(result.get('validation')), result)
+    matched = {validation: by_validation.get(_normalize(validation)) for validation in validation_types}
+
+    # Pair the remaining results with the remaining types by position, but only when the counts line up;
+    # otherwise an unmatched type shows no query rather than one written for a different type
+    used = {id(result) for result in matched.values() if result is not None}
+    leftover = [result for result in results if id(result) not in used]
+    unmatched = [validation for validation in validation_types if matched[validation] is None]
+    if len(leftover) == len(unmatched):
+        matched.update(zip(unmatched, leftover))
+
+    parsed = {}
+    for validation in validation_types:
+        result = matched[validation] or {}
+        parsed[validation] = (_unfence(_field_text(result.get('sql'))) or 'No SQL query generated.', _field_text(result.get('explanation')), _field_text(result.get('note')))
+    return parsed
+
+# Function to detect requests too incomplete to produce a useful query, so they skip the Gemini round-trip.
+# Returns the message to show the user, or None when the request should go ahead.
+def _is_trivial(source_system, target_system, validation_types, target_table) -> Optional[str]:
+    if source_system == "--Select--":
+        reason = "Please select a source system."
+    elif target_system == "--Select--":
+        reason = "Please select a target system."
+    elif target_table is None or target_table.empty:
+        reason = "Please enter target table details."
+    elif not validation_types:
+        reason = "Please select at least one validation type."
+    else:
+        return None
+    logger.info("Skipped Gemini call for incomplete request: %s", reason)
+    return reason
 
 # Generate Query button functionality
 if st.button("Generate Query"):
     if not api_key:
         st.error("Please add your Google Gemini API key.")
-    elif target_table is None or target_table.empty:
-        st.error("Please enter target table details.")
+    elif skip_reason := _is_trivial(source_system, target_system, validation_types, target_table):
+        st.error(skip_reason)
     else:
-        # Verify the API key before generating the query
-        if not verify_api_key(api_key):
-            st.error("API key is invalid. Please check and try again.")
-        else:
-            # Generate the query using Google Gemini API
-            response = generate_query(api_key, source_system, target_system, validation_type, source_table, target_table, source_condition, source_column, source_logic, target_condition, target_column, target_logic, temperature, top_p)
-            sql_query, explanation, note = parse_response(response)
+        # Generate all queries in one Google Gemini API request, showing the raw JSON while it streams in.
+        # There is deliberately no separate API key check here: an invalid key is reported by generate_query.
+        stream_placeholder = st.empty()
+        with stream_placeholder.container(), st.spinner("Generating queries..."):
+            content = generate_query(api_key, source_system, target_system, validation_types, source_table, target_table, source_condition, source_column, source_logic, target_condition, target_column, target_logic, temperature, top_p)
+        if content:
+            stream_placeholder.empty()
+        results = parse_response(content or '', validation_types)
 
-            st.header("Generated Query")
-            st.text_area("Query", value=sql_query, height=200)
+        st.header("Generated Queries")
+        for tab, validation in zip(st.tabs(validation_types), validation_types):
+            sql_query, explanation, note = results[validation]
+            with tab:
+                st.text_area("Query", value=sql_query, height=200, key=f"query_{validation}")
 
-            if explanation:
-                st.header("Explanation")
-                st.write(explanation)
+                if explanation:
+                    st.header("Explanation")
+                    st.write(explanation)
 
-            if note:
-                st.header("Note")
-                st.write(note)
+                if note:
+                    st.header("Note")
+                    st.write(note)